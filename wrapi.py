@@ -27,91 +27,311 @@ Examples:
     python wrapi.py files 550e8400-e29b-41d4-a716-446655440000
 """
 
-import argparse
+from __future__ import annotations
+
+import atexit
+import io
 import json
+import logging
 import os
+import re
 import sys
 import time
-import zipfile
-import tempfile
-import requests
+from collections import deque
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, List
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Deque, Iterator, Optional, List, Tuple
 from datetime import datetime
 
-# Try to load environment variables from .env file
+# argparse, requests, zipfile and dotenv are imported where they are used so
+# commands that never touch the network or build archives start faster
+if TYPE_CHECKING:
+    import argparse
+    import requests
+
+# Use orjson for JSON encoding/decoding when it is installed
 try:
-    from dotenv import load_dotenv
+    from orjson import OPT_INDENT_2, dumps as _dumps, loads as _loads
+    
+    def _dumps_indented(obj) -> bytes:
+        return _dumps(obj, option=OPT_INDENT_2)
+except ImportError:
+    from json import loads as _loads
+    
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj).encode('utf-8')
+    
+    def _dumps_indented(obj) -> bytes:
+        return json.dumps(obj, indent=2).encode('utf-8')
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+DEFAULT_API_URL = "https://wrm.neer.ai"  # Production URL
+CONFIG_FILE = os.path.expanduser("~/.wrapi_config.json")
+_SIM_TYPES = ('swmm', 'epanet', 'hec_ras')  # Accepted --type values
+_TOKEN_MASK = '*' * 20  # Shown in place of all but the token's last 10 characters
+CACHE_FILE = os.path.expanduser("~/.wrapi_cache.json")
+ETAG_CACHE_MAX_ENTRIES = 256
+UNCACHED_PARAMS = ('since', 'log_since')  # Query cursors that never repeat
+DOWNLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB reads keep per-chunk Python overhead low
+ETAGS_SIDECAR = ".etags.json"  # ETags of files downloaded by `files --download`
+
+# Deflate level for the input + auxiliary file bundle. The API only accepts
+# plain .zip uploads, so stay on deflate but at the fastest level.
+BUNDLE_COMPRESSLEVEL = 1
+BUNDLE_IN_MEMORY_MAX = 64 << 20  # Larger bundles are built in a temp file
+# Auxiliary files that are already compressed are stored as-is in the bundle
+PRECOMPRESSED_SUFFIXES = frozenset(('.zip', '.gz', '.tgz', '.bz2', '.xz', '.7z', '.zst'))
+
+
+def _load_dotenv():
+    """Load environment variables from a .env file, if python-dotenv is installed."""
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        return  # python-dotenv not installed, rely on system environment variables
+    
     # Load from .env in the same directory as this script
     env_path = Path(__file__).parent / '.env'
     if env_path.exists():
         load_dotenv(env_path)
     else:
         load_dotenv()  # Try default locations
-except ImportError:
-    pass  # python-dotenv not installed, rely on system environment variables
 
-# Configuration
-DEFAULT_API_URL = "https://wrm.neer.ai"  # Production URL
-CONFIG_FILE = os.path.expanduser("~/.wrapi_config.json")
+
+@lru_cache(maxsize=1)
+def _accept_encoding() -> str:
+    """Advertise the best response encodings urllib3 can decode in this environment."""
+    from urllib3.util import make_headers
+    
+    # urllib3 only lists zstd/br when zstandard/brotli are installed
+    available = make_headers(accept_encoding=True)['accept-encoding'].split(',')
+    return ', '.join(enc for enc in ('zstd', 'br', 'gzip') if enc in available)
+
+
+# ((mtime_ns, size), contents) of the config file as last read or written
+_config_cache: Optional[Tuple[Tuple[int, int], dict]] = None
+
+
+def _read_config() -> dict:
+    """Return a copy of the saved configuration (empty if there is none)."""
+    global _config_cache
+    try:
+        st = os.stat(CONFIG_FILE)
+        key = (st.st_mtime_ns, st.st_size)
+        # Reparse only when the file changed since we last saw it
+        if _config_cache is None or _config_cache[0] != key:
+            with open(CONFIG_FILE, 'rb') as f:
+                _config_cache = (key, _loads(f.read()))
+        return dict(_config_cache[1])
+    except FileNotFoundError:
+        return {}
+    except (OSError, json.JSONDecodeError) as e:
+        logger.debug("Ignoring unreadable config file %s: %s", CONFIG_FILE, e)
+        return {}
+
+
+def _open_private(path: str):
+    """
+    Open a fresh file for binary writing, readable by the owner only. Used
+    for files that hold the token or API responses.
+    """
+    try:
+        os.unlink(path)  # A leftover file would keep its old mode
+    except FileNotFoundError:
+        pass
+    return os.fdopen(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'wb')
+
+
+def _write_config(config: dict):
+    """Atomically replace the config file and remember what was written."""
+    global _config_cache
+    tmp_path = CONFIG_FILE + '.tmp'
+    with _open_private(tmp_path) as f:
+        f.write(_dumps_indented(config))
+        f.flush()
+        os.fsync(f.fileno())
+        st = os.fstat(f.fileno())
+    os.replace(tmp_path, CONFIG_FILE)
+    _config_cache = ((st.st_mtime_ns, st.st_size), dict(config))
+
+
+def _load_etag_cache() -> dict:
+    """Load the persisted {key: [etag, body]} response cache."""
+    try:
+        # Holds whole log/file listings, so decode with the fast parser too
+        with open(CACHE_FILE, 'rb') as f:
+            return _loads(f.read())
+    except FileNotFoundError:
+        return {}
+    except (OSError, json.JSONDecodeError) as e:
+        logger.debug("Ignoring unreadable cache file %s: %s", CACHE_FILE, e)
+        return {}
+
+
+# Response cache shared by all clients in the process: {key: [etag, body]}.
+# Loaded by the first client and written back once at exit if it changed.
+_etag_cache: Optional[dict] = None
+_etag_cache_dirty = False
+
+
+def _get_etag_cache() -> dict:
+    """Return the process-wide response cache, loading it on first use."""
+    global _etag_cache
+    if _etag_cache is None:
+        _etag_cache = _load_etag_cache()
+        atexit.register(_save_etag_cache)
+    return _etag_cache
+
+
+def _save_etag_cache():
+    """Write the response cache back to disk if it changed."""
+    global _etag_cache_dirty
+    if not _etag_cache_dirty:
+        return
+    # Bodies may include presigned result URLs, so keep the file private
+    tmp_path = CACHE_FILE + '.tmp'
+    try:
+        with _open_private(tmp_path) as f:
+            f.write(_dumps(_etag_cache))
+        os.replace(tmp_path, CACHE_FILE)
+        _etag_cache_dirty = False
+    except OSError as e:
+        logger.debug("Could not save cache file %s: %s", CACHE_FILE, e)
+
 
 class WRAPIClient:
     """Client for interacting with the Water Resources Modeling API."""
     
     def __init__(self, api_url: str = None, api_token: str = None):
-        self.api_url = api_url or os.getenv("WRAPI_URL", DEFAULT_API_URL)
+        import hashlib
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util import Retry
+        
+        _load_dotenv()
+        # Explicit argument, then environment, then `wrapi config` settings;
+        # the config file is parsed at most once per process
+        self.api_url = api_url or os.getenv("WRAPI_URL") or _read_config().get('url', DEFAULT_API_URL)
         self.api_token = api_token or os.getenv("WRAPI_TOKEN") or self._load_token()
         
         if not self.api_token:
             print("⚠️  No API token found. Set WRAPI_TOKEN environment variable or run:")
             print("   python wrapi.py config --token YOUR_TOKEN")
             sys.exit(1)
+        
+        # One pooled session for every API call and download, so polls, log
+        # fetches and downloads reuse connections instead of re-handshaking.
+        # Authorization is added per API request, not session-wide, so result
+        # file URLs on other hosts never receive the token.
+        self.session = requests.Session()
+        self.session.headers['Accept-Encoding'] = _accept_encoding()
+        adapter = HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=20,
+            max_retries=Retry(total=3, backoff_factor=0.3,
+                              status_forcelist=[502, 503, 504], raise_on_status=False)
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        
+        # ETag and last 200 body per GET URL, for conditional requests.
+        # Persisted on exit so consecutive CLI invocations can revalidate too.
+        # Keys are scoped by a token fingerprint so one account's cached
+        # bodies are never served to another on a 304.
+        self._etag_cache = _get_etag_cache()
+        self._cache_scope = hashlib.sha256(self.api_token.encode('utf-8')).hexdigest()[:16]
+        
+        # Whether GET /simulations/{id}?include=logs returns logs (None = untried)
+        self._bundle_supported = None
     
     def _load_token(self) -> Optional[str]:
         """Load API token from config file."""
-        if os.path.exists(CONFIG_FILE):
-            with open(CONFIG_FILE, 'r') as f:
-                config = json.load(f)
-                return config.get('token')
-        return None
+        return _read_config().get('token')
     
-    def _headers(self) -> dict:
+    def _headers(self, json_body: bool = False) -> dict:
         """Get request headers with authorization."""
-        return {
-            "Authorization": f"Bearer {self.api_token}",
-            "Content-Type": "application/json"
-        }
+        headers = {"Authorization": f"Bearer {self.api_token}"}
+        if json_body:
+            headers["Content-Type"] = "application/json"
+        return headers
     
     def _request(self, method: str, endpoint: str, **kwargs) -> requests.Response:
         """Make an API request."""
+        global _etag_cache_dirty
+        from urllib.parse import urlencode
+        import requests
+        
         url = f"{self.api_url}{endpoint}"
         headers = kwargs.pop('headers', self._headers())
         
+        # Revalidate GETs we have seen before; a 304 reuses the cached response.
+        # Cursor queries (log polls) never repeat, so they are not cached.
+        cache_key = None
+        cached = None
+        params = kwargs.get('params', {})
+        if method == "GET" and not any(p in params for p in UNCACHED_PARAMS):
+            cache_key = f"{self._cache_scope} {url}?{urlencode(sorted(params.items()))}"
+            cached = self._etag_cache.get(cache_key)
+            if cached:
+                headers = {**headers, "If-None-Match": cached[0]}
+        
         try:
-            response = requests.request(method, url, headers=headers, **kwargs)
-            return response
+            response = self.session.request(method, url, headers=headers, **kwargs)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            print(f"❌ API unavailable at {self.api_url}: {e}")
+            sys.exit(1)
         except requests.exceptions.RequestException as e:
             print(f"❌ Request failed: {e}")
             sys.exit(1)
+        
+        if cache_key:
+            if response.status_code == 304 and cached:
+                # Unchanged: stand in a 200 carrying the cached body
+                response = requests.Response()
+                response.status_code = 200
+                response._content = cached[1].encode('utf-8')
+                return response
+            etag = response.headers.get('ETag')
+            if response.status_code == 200 and etag:
+                self._etag_cache.pop(cache_key, None)  # Re-insert as newest
+                self._etag_cache[cache_key] = [etag, response.text]
+                _etag_cache_dirty = True
+                # Evict the least recently stored entries
+                while len(self._etag_cache) > ETAG_CACHE_MAX_ENTRIES:
+                    del self._etag_cache[next(iter(self._etag_cache))]
+        return response
+    
+    def _post_json(self, endpoint: str, payload: dict) -> requests.Response:
+        """POST a JSON body, serialized once with the fastest available encoder."""
+        return self._request("POST", endpoint, data=_dumps(payload),
+                             headers=self._headers(json_body=True))
     
     def health_check(self) -> bool:
         """Check if API is healthy."""
+        import requests
+        
         try:
-            response = requests.get(f"{self.api_url}/health", timeout=10)
+            response = self.session.get(f"{self.api_url}/health", timeout=10)
             return response.status_code == 200
-        except:
+        except requests.exceptions.RequestException as e:
+            logger.debug("Health check failed: %s", e)
             return False
     
     def list_simulations(self, sim_type: str = None, limit: int = 20) -> List[dict]:
         """List recent simulations."""
-        params = {}
+        # Let the server filter and truncate rather than shipping full history;
+        # the limit is still applied here in case it ignores the parameter
+        params = {'limit': limit}
         if sim_type:
             params['type'] = sim_type
         
         response = self._request("GET", "/simulations", params=params)
         
         if response.status_code == 200:
-            return response.json()[:limit]
+            return _loads(response.content)[:limit]
         else:
             print(f"❌ Failed to list simulations: {response.text}")
             return []
@@ -121,7 +341,7 @@ class WRAPIClient:
         response = self._request("GET", f"/simulations/{sim_id}")
         
         if response.status_code == 200:
-            return response.json()
+            return _loads(response.content)
         elif response.status_code == 404:
             print(f"❌ Simulation not found: {sim_id}")
             return None
@@ -129,22 +349,57 @@ class WRAPIClient:
             print(f"❌ Failed to get simulation: {response.text}")
             return None
     
-    def get_simulation_logs(self, sim_id: str, limit: int = 50) -> List[dict]:
-        """Get simulation logs."""
-        response = self._request("GET", f"/simulations/{sim_id}/logs", params={"limit": limit})
+    def get_simulation_logs(self, sim_id: str, limit: int = 50, since: str = None) -> List[dict]:
+        """Get simulation logs, optionally only those newer than `since`."""
+        params = {"limit": limit}
+        if since:
+            params['since'] = since
+        
+        response = self._request("GET", f"/simulations/{sim_id}/logs", params=params)
         
         if response.status_code == 200:
-            return response.json().get('logs', [])
+            return _loads(response.content).get('logs', [])
         else:
             print(f"❌ Failed to get logs: {response.text}")
             return []
     
+    def get_simulation_bundle(self, sim_id: str, log_limit: int = 20,
+                              log_since: str = None) -> Tuple[Optional[dict], List[dict]]:
+        """
+        Get simulation details and its latest logs.
+        
+        Uses a single `?include=logs` request when the API supports it and falls
+        back to separate status and logs requests otherwise.
+        """
+        if self._bundle_supported is not False:
+            params = {'include': 'logs', 'log_limit': log_limit}
+            if log_since:
+                params['log_since'] = log_since
+            
+            response = self._request("GET", f"/simulations/{sim_id}", params=params)
+            
+            if response.status_code == 200:
+                sim = _loads(response.content)
+                if 'logs' in sim:
+                    self._bundle_supported = True
+                    return sim, sim.pop('logs') or []
+                # Parameter ignored, but the body is still the simulation record
+                self._bundle_supported = False
+                return sim, self.get_simulation_logs(sim_id, limit=log_limit, since=log_since)
+            elif response.status_code == 404:
+                self._bundle_supported = False  # Parameter rejected (or unknown ID)
+        
+        sim = self.get_simulation(sim_id)
+        if not sim:
+            return None, []
+        return sim, self.get_simulation_logs(sim_id, limit=log_limit, since=log_since)
+    
     def get_simulation_files(self, sim_id: str) -> List[dict]:
         """Get simulation result files."""
         response = self._request("GET", f"/simulations/{sim_id}/files")
         
         if response.status_code == 200:
-            return response.json()
+            return _loads(response.content)
         else:
             print(f"❌ Failed to get files: {response.text}")
             return []
@@ -158,10 +413,10 @@ class WRAPIClient:
         if label:
             data["label"] = label
         
-        response = self._request("POST", "/simulations", json=data)
+        response = self._post_json("/simulations", data)
         
         if response.status_code == 201:
-            return response.json()
+            return _loads(response.content)
         else:
             print(f"❌ Failed to create simulation: {response.text}")
             return None
@@ -169,80 +424,250 @@ class WRAPIClient:
     def run_simulation_from_file(self, input_file: str, sim_type: str, 
                                   label: str = None, aux_files: List[str] = None) -> Optional[dict]:
         """Run simulation from local file(s)."""
-        input_path = Path(input_file)
-        
-        if not input_path.exists():
+        try:
+            input_size = os.stat(input_file).st_size
+        except FileNotFoundError:
             print(f"❌ Input file not found: {input_file}")
             return None
+        input_name = os.path.basename(input_file)
         
         # Prepare the file(s) to upload
         if aux_files:
-            # Create a zip file with input + auxiliary files
-            with tempfile.NamedTemporaryFile(suffix='.zip', delete=False) as tmp:
-                zip_path = tmp.name
+            import zipfile
             
-            with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zf:
-                zf.write(input_path, input_path.name)
+            # The zip is written once, uploaded once and discarded: build it in
+            # memory unless the inputs are large, then in an anonymous temp file
+            total_size = input_size
+            for aux in aux_files:
+                try:
+                    total_size += os.stat(aux).st_size
+                except OSError:
+                    pass  # Reported below when it is added to the bundle
+            if total_size < BUNDLE_IN_MEMORY_MAX:
+                upload = io.BytesIO()
+            else:
+                import tempfile
+                upload = tempfile.TemporaryFile()
+            with zipfile.ZipFile(upload, 'w', zipfile.ZIP_DEFLATED,
+                                 compresslevel=BUNDLE_COMPRESSLEVEL) as zf:
+                zf.write(input_file, input_name)
                 for aux in aux_files:
-                    aux_path = Path(aux)
-                    if aux_path.exists():
-                        zf.write(aux_path, aux_path.name)
-                    else:
+                    stored = os.path.splitext(aux)[1].lower() in PRECOMPRESSED_SUFFIXES
+                    try:
+                        zf.write(aux, os.path.basename(aux),
+                                 compress_type=zipfile.ZIP_STORED if stored else None)
+                    except FileNotFoundError:
                         print(f"⚠️  Auxiliary file not found: {aux}")
-            
-            upload_path = zip_path
-            upload_name = input_path.stem + '.zip'
+            upload.seek(0)
+            upload_name = os.path.splitext(input_name)[0] + '.zip'
         else:
-            upload_path = str(input_path)
-            upload_name = input_path.name
+            upload = open(input_file, 'rb')
+            upload_name = input_name
+        
+        # Stream multipart uploads from disk when requests-toolbelt is available
+        try:
+            from requests_toolbelt import MultipartEncoder
+        except ImportError:
+            MultipartEncoder = None  # Fall back to requests' buffered multipart body
         
         # Upload via multipart form
-        with open(upload_path, 'rb') as f:
-            files = {'file': (upload_name, f)}
+        with upload as f:
             data = {'type': sim_type}
             if label:
                 data['label'] = label
             
-            headers = {"Authorization": f"Bearer {self.api_token}"}
-            response = requests.post(
-                f"{self.api_url}/simulations",
-                headers=headers,
-                files=files,
-                data=data
-            )
-        
-        # Cleanup temp zip
-        if aux_files and os.path.exists(zip_path):
-            os.unlink(zip_path)
+            headers = self._headers()
+            if MultipartEncoder is not None:
+                # Stream the body from the file handle instead of buffering it
+                encoder = MultipartEncoder(fields={
+                    **data,
+                    'file': (upload_name, f, 'application/octet-stream'),
+                })
+                headers['Content-Type'] = encoder.content_type
+                response = self._request("POST", "/simulations", headers=headers, data=encoder)
+            else:
+                response = self._request("POST", "/simulations", headers=headers,
+                                         files={'file': (upload_name, f)}, data=data)
         
         if response.status_code == 201:
-            return response.json()
+            return _loads(response.content)
         else:
             print(f"❌ Failed to create simulation: {response.text}")
             return None
     
-    def wait_for_completion(self, sim_id: str, timeout: int = 600, interval: int = 15) -> Optional[dict]:
-        """Wait for simulation to complete by polling logs every 15 seconds."""
+    def stream_events(self, sim_id: str, deadline: Optional[float] = None) -> Optional[Iterator[dict]]:
+        """
+        Subscribe to the simulation's server-sent event stream.
+        
+        Returns an iterator over the decoded `data:` payloads (log events carry
+        `timestamp`/`message`, status events carry `status`), or None if the API
+        does not expose /simulations/{id}/events. Events whose data is not a
+        JSON object (keepalives and the like) are skipped. The iterator closes
+        the stream and stops once `deadline` (a time.time() value) passes, even
+        if only keepalives are arriving.
+        """
+        import requests
+        
+        read_timeout = 35
+        if deadline is not None:
+            read_timeout = max(1, min(read_timeout, deadline - time.time()))
+        try:
+            response = self.session.get(
+                f"{self.api_url}/simulations/{sim_id}/events",
+                headers={**self._headers(), "Accept": "text/event-stream"},
+                stream=True,
+                timeout=(3, read_timeout)
+            )
+        except requests.exceptions.RequestException as e:
+            logger.debug("Event stream unavailable: %s", e)
+            return None
+        
+        if response.status_code != 200:
+            response.close()
+            return None
+        
+        def events():
+            with response:
+                data = []
+                try:
+                    for line in response.iter_lines(decode_unicode=True):
+                        if deadline is not None and time.time() >= deadline:
+                            logger.debug("Event stream deadline passed")
+                            return
+                        if line:
+                            # Only data fields matter; comments and other fields are skipped
+                            if line.startswith('data:'):
+                                value = line[5:]
+                                data.append(value[1:] if value.startswith(' ') else value)
+                            continue
+                        # A blank line ends the event; multi-line data is joined
+                        if not data:
+                            continue
+                        payload = '\n'.join(data)
+                        data = []
+                        try:
+                            event = _loads(payload)
+                        except ValueError:
+                            event = None
+                        if not isinstance(event, dict):
+                            logger.debug("Skipping non-JSON event: %r", payload)
+                            continue
+                        yield event
+                except requests.exceptions.RequestException as e:
+                    # Idle past the read timeout or dropped; callers fall back to polling
+                    logger.debug("Event stream ended: %s", e)
+        
+        return events()
+    
+    def _follow_events(self, sim_id: str, events: Iterator[dict], deadline: float,
+                       seen_logs: Deque[Tuple[str, int]]):
+        """
+        Print streamed log events until the simulation finishes.
+        
+        Printed logs are recorded in `seen_logs`. Returns (simulation,
+        last_seen_ts); the simulation is None if the stream ended or the
+        deadline passed before completion.
+        """
+        last_seen_ts = ""
+        last_progress = None
+        
+        for event in events:
+            msg = event.get('message')
+            if msg:
+                ts = event.get('timestamp', '')
+                last_seen_ts = max(last_seen_ts, ts)
+                seen_logs.append((ts, hash(msg)))
+                print(f"   [{_short_time(ts)}] {msg}")
+                
+                progress = extract_progress_from_logs([event])
+                if progress is not None and progress != last_progress:
+                    bar_length = 30
+                    filled = int(bar_length * progress / 100)
+                    bar = '█' * filled + '░' * (bar_length - filled)
+                    print(f"   Progress: [{bar}] {progress:.1f}%")
+                    last_progress = progress
+            
+            if event.get('status') in ['completed', 'failed']:
+                return self.get_simulation(sim_id), last_seen_ts
+            
+            if time.time() >= deadline:
+                break
+        
+        return None, last_seen_ts
+    
+    def wait_for_completion(self, sim_id: str, timeout: int = 600, interval: float = 15,
+                            min_interval: float = 1.0) -> Optional[dict]:
+        """
+        Wait for simulation to complete.
+        
+        Follows the server-sent event stream when the API offers one. Otherwise
+        (or once the stream drops) polls status and logs, starting every
+        `min_interval` seconds and backing off by 1.5x up to `interval`. The
+        delay resets whenever the status or reported progress changes, and is
+        shortened to the estimated time remaining when progress is advancing.
+        """
         start_time = time.time()
+        delay = min_interval
         last_status = None
-        seen_log_messages = set()
+        last_seen_ts = ""
+        # Recently printed (timestamp, message hash) pairs, to tell apart logs
+        # that share the cursor's timestamp without growing with run length
+        seen_logs = deque(maxlen=200)
+        log_progress = None
         last_progress = None
+        first_progress = None  # (time, progress) of the first log-reported value
+        
+        events = self.stream_events(sim_id, deadline=start_time + timeout)
+        if events is not None:
+            print("   Following live events...")
+            sim, last_seen_ts = self._follow_events(sim_id, events, start_time + timeout,
+                                                    seen_logs)
+            if sim:
+                return sim
         
-        print(f"   Polling logs every {interval}s...")
+        print(f"   Polling logs every {min_interval:g}-{interval:g}s...")
         
         while time.time() - start_time < timeout:
-            # Get simulation status
-            sim = self.get_simulation(sim_id)
+            # Get simulation status and the logs newer than the last one shown
+            sim, logs = self.get_simulation_bundle(sim_id, log_limit=20, log_since=last_seen_ts)
             if not sim:
                 return None
             
             status = sim.get('status')
             
-            # Get latest logs to show progress
-            logs = self.get_simulation_logs(sim_id, limit=20)
+            # Single pass over the new log messages (newest first in response,
+            # so reverse for display): collect display lines and the newest
+            # progress value together. Logs are ISO timestamped, so string
+            # comparison orders them and anything before the cursor has
+            # already been printed.
+            log_lines = []
+            new_progress = None
+            for log in reversed(logs):
+                ts = log.get('timestamp', '')
+                msg = log.get('message', '')
+                if ts < last_seen_ts:
+                    continue
+                log_key = (ts, hash(msg))
+                if log_key in seen_logs:
+                    continue
+                seen_logs.append(log_key)
+                log_lines.append(f"   [{_short_time(ts)}] {msg}")
+                
+                msg_progress = _progress_from_message(msg)
+                if msg_progress is not None:
+                    new_progress = msg_progress
+            
+            if logs:
+                last_seen_ts = max(last_seen_ts, logs[0].get('timestamp', ''))
             
-            # Extract and display progress
-            progress = extract_progress_from_logs(logs)
+            # Update progress (keep the last reported value when no new
+            # progress message has arrived)
+            progress_changed = new_progress is not None and new_progress != log_progress
+            if new_progress is not None:
+                log_progress = new_progress
+                if first_progress is None:
+                    first_progress = (time.time(), new_progress)
+            progress = log_progress
             if progress is None and status == 'running':
                 progress = calculate_time_progress(sim)
             
@@ -254,32 +679,8 @@ class WRAPIClient:
                 print(f"   Progress: [{bar}] {progress:.1f}%")
                 last_progress = progress
             
-            # Display new log messages (newest first in response, so reverse for display)
-            for log in reversed(logs):
-                msg = log.get('message', '')
-                ts = log.get('timestamp', '')
-                log_key = f"{ts}:{msg}"
-                
-                if log_key not in seen_log_messages:
-                    seen_log_messages.add(log_key)
-                    # Format timestamp for display
-                    try:
-                        # Handle various timestamp formats
-                        ts_clean = ts.replace('Z', '+00:00')
-                        if '.' in ts_clean:
-                            # Truncate microseconds if too long
-                            parts = ts_clean.split('.')
-                            if len(parts[1]) > 6:
-                                ts_clean = parts[0] + '.' + parts[1][:6] + '+00:00'
-                        dt = datetime.fromisoformat(ts_clean)
-                        ts_short = dt.strftime('%H:%M:%S')
-                    except:
-                        # Fallback: extract time portion if available
-                        if 'T' in ts and ':' in ts:
-                            ts_short = ts.split('T')[1][:8]
-                        else:
-                            ts_short = ts[:8] if ts else ''
-                    print(f"   [{ts_short}] {msg}")
+            if log_lines:
+                _write_rows(log_lines)
             
             # Check if completed or failed
             if status in ['completed', 'failed']:
@@ -287,88 +688,141 @@ class WRAPIClient:
                     print(f"   Progress: [{'█' * 30}] 100.0%")
                 return sim
             
-            # Update status display if changed
-            if status != last_status:
-                last_status = status
+            # Poll densely after a state change and back off while nothing moves
+            if progress_changed or status != last_status:
+                delay = min_interval
+            else:
+                delay = min(delay * 1.5, interval)
+            last_status = status
+            
+            # If progress is advancing, don't sleep past the estimated finish
+            if first_progress and log_progress > first_progress[1]:
+                rate = (log_progress - first_progress[1]) / (time.time() - first_progress[0])
+                remaining = (100 - log_progress) / rate
+                delay = max(min_interval, min(delay, remaining))
             
-            time.sleep(interval)
+            time.sleep(delay)
         
         print(f"⚠️  Timeout waiting for simulation after {timeout}s")
         return self.get_simulation(sim_id)
 
 
+# Percentage in a log message: "Progress: 50%", "50.5%" or "50 percent"
+_PROGRESS_RE = re.compile(r'(?:progress[:\s]+)?(\d+(?:\.\d+)?)\s*(?:%|percent)')
+
+
+def _progress_from_message(msg: str) -> Optional[float]:
+    """Return the progress percentage mentioned in a log message, if any."""
+    match = _PROGRESS_RE.search(msg.lower())
+    return float(match.group(1)) if match else None
+
+
 def extract_progress_from_logs(logs: List[dict]) -> Optional[float]:
     """Extract progress percentage from log messages."""
-    import re
-    
     # Look for progress indicators in logs
     for log in reversed(logs):  # Check newest first
-        msg = log.get('message', '').lower()
-        
-        # Look for percentage patterns
-        patterns = [
-            r'(\d+(?:\.\d+)?)\s*%',  # "50%" or "50.5%"
-            r'progress[:\s]+(\d+(?:\.\d+)?)\s*%',  # "Progress: 50%"
-            r'(\d+(?:\.\d+)?)\s*percent',  # "50 percent"
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, msg)
-            if match:
-                try:
-                    return float(match.group(1))
-                except:
-                    pass
+        progress = _progress_from_message(log.get('message', ''))
+        if progress is not None:
+            return progress
     
     return None
 
 
 def calculate_time_progress(sim: dict) -> Optional[float]:
     """Calculate progress based on elapsed time vs estimated total."""
-    started_at = sim.get('started_at')
-    if not started_at:
+    started = _parse_iso(sim.get('started_at'))
+    if started is None:
         return None
     
-    try:
-        started = datetime.fromisoformat(started_at.replace('Z', '+00:00'))
-        elapsed = (datetime.now(started.tzinfo) - started).total_seconds()
-        
-        # For SWMM/EPANET, most simulations complete in seconds to minutes
-        # We can estimate based on status and elapsed time
-        status = sim.get('status', '')
-        
-        if status == 'running':
-            # If running for more than 30 seconds, likely a longer simulation
-            # Estimate based on typical ranges (most complete in 1-5 minutes)
-            if elapsed < 10:
-                return min(50, elapsed / 10 * 50)  # Early stage
-            elif elapsed < 60:
-                return min(80, 50 + (elapsed - 10) / 50 * 30)  # Mid stage
-            else:
-                return min(95, 80 + (elapsed - 60) / 300 * 15)  # Late stage
-        
-    except:
-        pass
+    elapsed = (datetime.now(started.tzinfo) - started).total_seconds()
+    
+    # For SWMM/EPANET, most simulations complete in seconds to minutes
+    # We can estimate based on status and elapsed time
+    status = sim.get('status', '')
+    
+    if status == 'running':
+        # If running for more than 30 seconds, likely a longer simulation
+        # Estimate based on typical ranges (most complete in 1-5 minutes)
+        if elapsed < 10:
+            return min(50, elapsed / 10 * 50)  # Early stage
+        elif elapsed < 60:
+            return min(80, 50 + (elapsed - 10) / 50 * 30)  # Mid stage
+        else:
+            return min(95, 80 + (elapsed - 60) / 300 * 15)  # Late stage
     
     return None
 
 
+if sys.version_info >= (3, 11):
+    # Accepts 'Z' and any number of fractional digits as-is
+    _fromisoformat = datetime.fromisoformat
+else:
+    # Sub-microsecond digits that datetime.fromisoformat() rejects
+    _EXCESS_FRACTION_RE = re.compile(r'(\.\d{6})\d+')
+    
+    def _fromisoformat(ts: str) -> datetime:
+        return datetime.fromisoformat(_EXCESS_FRACTION_RE.sub(r'\1', ts.replace('Z', '+00:00')))
+
+
+@lru_cache(maxsize=4096)
+def _parse_iso(ts: str) -> Optional[datetime]:
+    """Parse an API ISO-8601 timestamp, or return None if it is malformed."""
+    if not ts:
+        return None
+    try:
+        return _fromisoformat(ts)
+    except ValueError as e:
+        logger.debug("Cannot parse timestamp %r: %s", ts, e)
+        return None
+
+
+@lru_cache(maxsize=1024)
+def _short_time(ts: str) -> str:
+    """Return the HH:MM:SS part of an ISO timestamp for log display."""
+    # Fast path: slice "YYYY-MM-DDTHH:MM:SS..." without building a datetime
+    t = ts.find('T')
+    short = ts[t + 1:t + 9]
+    if t != -1 and len(short) == 8 and short[2] == ':' and short[5] == ':':
+        return short
+    
+    dt = _parse_iso(ts)
+    if dt:
+        return dt.strftime('%H:%M:%S')
+    return ts[:8] if ts else ''
+
+
+@lru_cache(maxsize=1024)
 def format_timestamp(ts: str) -> str:
     """Format ISO timestamp for display."""
-    try:
-        dt = datetime.fromisoformat(ts.replace('Z', '+00:00'))
-        return dt.strftime('%Y-%m-%d %H:%M:%S')
-    except:
-        return ts
+    dt = _parse_iso(ts)
+    return dt.strftime('%Y-%m-%d %H:%M:%S') if dt else ts
+
+
+SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB')
 
 
+@lru_cache(maxsize=256)
 def format_size(size: int) -> str:
     """Format file size for display."""
-    for unit in ['B', 'KB', 'MB', 'GB']:
-        if size < 1024:
-            return f"{size:.1f} {unit}"
-        size /= 1024
-    return f"{size:.1f} TB"
+    size = int(size)
+    # Each unit is 2**10 of the previous one, so the bit length picks the unit
+    idx = 0 if size <= 0 else min(len(SIZE_UNITS) - 1, (size.bit_length() - 1) // 10)
+    return f"{size / (1 << (idx * 10)):.1f} {SIZE_UNITS[idx]}"
+
+
+# A [Results] section: its header line up to the next section header or EOF
+_INI_RESULTS_SECTION_RE = re.compile(r'(?ms)^[ \t]*\[Results\][ \t]*$.*?(?=^[ \t]*\[|\Z)')
+_INI_CURRENT_RE = re.compile(r'(?m)^[ \t]*Current=.*$')
+
+
+def _set_results_current(match: re.Match) -> str:
+    """Set Current=1 in a [Results] section, adding it at the end if missing."""
+    section, found = _INI_CURRENT_RE.subn('Current=1', match.group(0), count=1)
+    if not found:
+        if not section.endswith('\n'):
+            section += '\n'
+        section += 'Current=1\n'
+    return section
 
 
 def copy_and_update_ini_file(input_file_path: str, results_folder: Path) -> bool:
@@ -393,37 +847,15 @@ def copy_and_update_ini_file(input_file_path: str, results_folder: Path) -> bool
     
     try:
         # Read the .ini file and update Current=1 under [Results]
-        updated_lines = []
-        inside_results = False
-        found_current = False
-        
-        with open(ini_path, 'r', encoding='utf-8', errors='replace') as file:
-            for line in file:
-                if line.strip() == '[Results]':
-                    inside_results = True
-                    updated_lines.append(line)
-                elif inside_results and line.strip().startswith('Current='):
-                    updated_lines.append('Current=1\n')
-                    inside_results = False
-                    found_current = True
-                elif line.strip().startswith('[') and inside_results:
-                    # New section started without finding Current=
-                    # Add Current=1 before the new section
-                    if not found_current:
-                        updated_lines.append('Current=1\n')
-                    inside_results = False
-                    updated_lines.append(line)
-                else:
-                    updated_lines.append(line)
+        text = ini_path.read_text(encoding='utf-8', errors='replace')
+        text = _INI_RESULTS_SECTION_RE.sub(_set_results_current, text)
         
-        # If [Results] was the last section and had no Current=
-        if inside_results and not found_current:
-            updated_lines.append('Current=1\n')
-        
-        # Write updated .ini file to results folder with original filename
+        # Write updated .ini file to results folder with original filename,
+        # via a temp file so an interrupted write never leaves a partial .ini
         dest_ini_path = results_folder / ini_filename
-        with open(dest_ini_path, 'w', encoding='utf-8') as file:
-            file.writelines(updated_lines)
+        tmp_path = dest_ini_path.with_suffix(dest_ini_path.suffix + '.tmp')
+        tmp_path.write_text(text, encoding='utf-8')
+        os.replace(tmp_path, dest_ini_path)
         
         size_str = format_size(dest_ini_path.stat().st_size)
         print(f"   ✅ {ini_filename:40} ({size_str}) - Updated Current=1 under [Results]")
@@ -434,8 +866,57 @@ def copy_and_update_ini_file(input_file_path: str, results_folder: Path) -> bool
         return False
 
 
+def _unique_name(filename: str, used_names: set) -> str:
+    """
+    Return filename, or filename with a _2, _3, ... suffix if it is already in
+    used_names, and record the result. Downloads run concurrently, so two
+    entries must never share a path.
+    """
+    if filename in used_names:
+        stem, suffix = os.path.splitext(filename)
+        n = 2
+        while f"{stem}_{n}{suffix}" in used_names:
+            n += 1
+        filename = f"{stem}_{n}{suffix}"
+    used_names.add(filename)
+    return filename
+
+
+def _download(session: requests.Session, url: str, filepath: Path,
+              etag: Optional[str] = None) -> Tuple[Optional[str], bool]:
+    """
+    Stream a single file to disk in DOWNLOAD_CHUNK_SIZE pieces so large .out
+    files never sit in memory whole. Raises requests.HTTPError on a non-2xx
+    response.
+    
+    If etag is given the server may answer 304, in which case the existing
+    file is left alone. Returns (etag, reused). The body goes to a .part file
+    that replaces filepath only once complete, so a failed download never
+    clobbers an existing copy.
+    """
+    headers = {"If-None-Match": etag} if etag else None
+    with session.get(url, headers=headers, timeout=60, stream=True) as response:
+        if response.status_code == 304:
+            return response.headers.get('ETag', etag), True
+        response.raise_for_status()
+        # iter_content undoes any Content-Encoding and re-raises urllib3
+        # stream errors (timeouts, truncated bodies) as requests exceptions
+        part_path = filepath.with_suffix(filepath.suffix + '.part')
+        try:
+            with open(part_path, 'wb') as out:
+                for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                    out.write(chunk)
+            os.replace(part_path, filepath)
+        except BaseException:
+            part_path.unlink(missing_ok=True)
+            raise
+        return response.headers.get('ETag'), False
+
+
 def download_results_to_timestamped_folder(client: WRAPIClient, sim_id: str, files: List[dict], input_file_path: Optional[str] = None):
     """Download simulation results to a timestamped folder, preserving original filenames."""
+    import zipfile
+    from concurrent.futures import ThreadPoolExecutor, as_completed
     from urllib.parse import unquote
     
     # Create results directory
@@ -449,7 +930,8 @@ def download_results_to_timestamped_folder(client: WRAPIClient, sim_id: str, fil
     
     print(f"\n⬇️  Downloading results to: {sim_folder}/")
     
-    downloaded_count = 0
+    downloads = []
+    used_names = set()
     for f in files:
         file_type = f.get('type', 'unknown')
         url = f.get('url', '')
@@ -475,24 +957,24 @@ def download_results_to_timestamped_folder(client: WRAPIClient, sim_id: str, fil
             else:
                 filename = f"{file_type}.{file_type}"
         
-        filepath = sim_folder / filename
-        
-        try:
-            response = requests.get(url, timeout=60, stream=True)
-            response.raise_for_status()
-            
-            # Download file
-            with open(filepath, 'wb') as out_file:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        out_file.write(chunk)
-            
-            size_str = format_size(filepath.stat().st_size)
-            print(f"   ✅ {filename:40} ({size_str})")
-            downloaded_count += 1
-            
-        except Exception as e:
-            print(f"   ❌ Failed to download {filename}: {e}")
+        filename = _unique_name(filename, used_names)
+        downloads.append((url, filename, sim_folder / filename))
+    
+    # Download concurrently over the shared session, reporting each file as
+    # soon as it finishes rather than waiting on the slowest one
+    downloaded_count = 0
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        futures = {pool.submit(_download, client.session, url, filepath): (filename, filepath)
+                   for url, filename, filepath in downloads}
+        for future in as_completed(futures):
+            filename, filepath = futures[future]
+            try:
+                future.result()
+                size_str = format_size(filepath.stat().st_size)
+                print(f"   ✅ {filename:40} ({size_str})")
+                downloaded_count += 1
+            except Exception as e:
+                print(f"   ❌ Failed to download {filename}: {e}")
     
     # Check for and process .ini file if input file path is provided
     ini_processed = False
@@ -536,12 +1018,18 @@ def download_results_to_timestamped_folder(client: WRAPIClient, sim_id: str, fil
         print(f"\n⚠️  No files were downloaded")
 
 
+def _write_rows(rows: List[str]):
+    """Write pre-formatted lines to stdout in a single call."""
+    sys.stdout.write('\n'.join(rows) + '\n')
+
+
 def cmd_run(args):
     """Run a simulation."""
     client = WRAPIClient()
     
-    # Check API health
-    if not client.health_check():
+    # Optional pre-flight probe; it shares the session's connection with the
+    # upload. Without it an unreachable API is reported by the request itself.
+    if args.check_health and not client.health_check():
         print("⚠️  API may be unavailable, proceeding anyway...")
     
     input_source = args.input
@@ -609,62 +1097,6 @@ def cmd_run(args):
         print(f"To get files:    python wrapi.py files {sim_id}")
 
 
-def extract_progress_from_logs(logs: List[dict]) -> Optional[float]:
-    """Extract progress percentage from log messages."""
-    import re
-    
-    # Look for progress indicators in logs
-    for log in reversed(logs):  # Check newest first
-        msg = log.get('message', '').lower()
-        
-        # Look for percentage patterns
-        patterns = [
-            r'(\d+(?:\.\d+)?)\s*%',  # "50%" or "50.5%"
-            r'progress[:\s]+(\d+(?:\.\d+)?)\s*%',  # "Progress: 50%"
-            r'(\d+(?:\.\d+)?)\s*percent',  # "50 percent"
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, msg)
-            if match:
-                try:
-                    return float(match.group(1))
-                except:
-                    pass
-    
-    return None
-
-
-def calculate_time_progress(sim: dict) -> Optional[float]:
-    """Calculate progress based on elapsed time vs estimated total."""
-    started_at = sim.get('started_at')
-    if not started_at:
-        return None
-    
-    try:
-        started = datetime.fromisoformat(started_at.replace('Z', '+00:00'))
-        elapsed = (datetime.now(started.tzinfo) - started).total_seconds()
-        
-        # For SWMM/EPANET, most simulations complete in seconds to minutes
-        # We can estimate based on status and elapsed time
-        status = sim.get('status', '')
-        
-        if status == 'running':
-            # If running for more than 30 seconds, likely a longer simulation
-            # Estimate based on typical ranges (most complete in 1-5 minutes)
-            if elapsed < 10:
-                return min(50, elapsed / 10 * 50)  # Early stage
-            elif elapsed < 60:
-                return min(80, 50 + (elapsed - 10) / 50 * 30)  # Mid stage
-            else:
-                return min(95, 80 + (elapsed - 60) / 300 * 15)  # Late stage
-        
-    except:
-        pass
-    
-    return None
-
-
 def cmd_status(args):
     """Check simulation status with progress information."""
     client = WRAPIClient()
@@ -678,24 +1110,24 @@ def cmd_status(args):
         print(f"   Status:  {sim['status']}")
         print(f"   Created: {format_timestamp(sim['created_at'])}")
         
+        started = _parse_iso(sim.get('started_at'))
         if sim.get('started_at'):
-            started = datetime.fromisoformat(sim['started_at'].replace('Z', '+00:00'))
             print(f"   Started: {format_timestamp(sim['started_at'])}")
             
             # Calculate elapsed time
-            elapsed = (datetime.now(started.tzinfo) - started).total_seconds()
-            if elapsed < 60:
-                print(f"   Elapsed: {elapsed:.1f} seconds")
-            else:
-                print(f"   Elapsed: {elapsed/60:.1f} minutes")
+            if started:
+                elapsed = (datetime.now(started.tzinfo) - started).total_seconds()
+                if elapsed < 60:
+                    print(f"   Elapsed: {elapsed:.1f} seconds")
+                else:
+                    print(f"   Elapsed: {elapsed/60:.1f} minutes")
         
         if sim.get('completed_at'):
             print(f"   Completed: {format_timestamp(sim['completed_at'])}")
             
             # Calculate total execution time
-            if sim.get('started_at'):
-                started = datetime.fromisoformat(sim['started_at'].replace('Z', '+00:00'))
-                completed = datetime.fromisoformat(sim['completed_at'].replace('Z', '+00:00'))
+            completed = _parse_iso(sim['completed_at'])
+            if started and completed:
                 exec_time = (completed - started).total_seconds()
                 print(f"   Duration: {exec_time:.2f} seconds ({exec_time/60:.2f} minutes)")
         
@@ -733,15 +1165,7 @@ def cmd_status(args):
             if logs:
                 print(f"\n📋 Recent Log Messages:")
                 for log in logs[-3:]:  # Show last 3 messages
-                    msg = log.get('message', '')
-                    ts = log.get('timestamp', '')
-                    try:
-                        ts_clean = ts.replace('Z', '+00:00')
-                        dt = datetime.fromisoformat(ts_clean)
-                        ts_short = dt.strftime('%H:%M:%S')
-                    except:
-                        ts_short = ts[:8] if ts else ''
-                    print(f"   [{ts_short}] {msg}")
+                    print(f"   [{_short_time(log.get('timestamp', ''))}] {log.get('message', '')}")
         else:
             print()
 
@@ -752,45 +1176,73 @@ def cmd_logs(args):
     logs = client.get_simulation_logs(args.id, limit=args.limit)
     
     if logs:
-        print(f"\n📋 Simulation Logs (showing {len(logs)})")
-        print("-" * 60)
-        for log in reversed(logs):  # Show oldest first
-            ts = format_timestamp(log['timestamp'])
-            print(f"[{ts}] {log['message']}")
+        rows = [f"\n📋 Simulation Logs (showing {len(logs)})", "-" * 60]
+        rows.extend(f"[{format_timestamp(log['timestamp'])}] {log['message']}"
+                    for log in reversed(logs))  # Show oldest first
+        _write_rows(rows)
     else:
         print("No logs found.")
 
 
 def cmd_files(args):
     """List simulation result files."""
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    import requests
+    
     client = WRAPIClient()
     files = client.get_simulation_files(args.id)
     
     if files:
-        print(f"\n📁 Simulation Files")
-        print("-" * 80)
-        for f in files:
-            size_str = format_size(f.get('size', 0))
-            print(f"[{f['type']:10}] {size_str:>10}  {f['url']}")
+        rows = [f"\n📁 Simulation Files", "-" * 80]
+        rows.extend(f"[{f['type']:10}] {format_size(f.get('size', 0)):>10}  {f['url']}"
+                    for f in files)
+        _write_rows(rows)
         
         # Offer to download
         if args.download:
             download_dir = Path(args.download)
             download_dir.mkdir(parents=True, exist_ok=True)
             
+            # ETags from the last download into this folder; files that are
+            # still there are revalidated and skipped if unchanged (304)
+            etags_file = download_dir / ETAGS_SIDECAR
+            try:
+                etags = _loads(etags_file.read_bytes())
+            except (OSError, ValueError):
+                etags = {}
+            
             print(f"\n⬇️  Downloading to {download_dir}/")
-            for f in files:
-                filename = f['url'].split('/')[-1]
-                filepath = download_dir / filename
+            reused = 0
+            used_names = set()
+            with ThreadPoolExecutor(max_workers=min(8, len(files))) as pool:
+                futures = {}
+                for f in files:
+                    filename = _unique_name(f['url'].split('/')[-1], used_names)
+                    filepath = download_dir / filename
+                    etag = etags.get(filename) if filepath.exists() else None
+                    futures[pool.submit(_download, client.session, f['url'], filepath, etag)] = filename
                 
-                print(f"   {filename}...", end=" ")
-                response = requests.get(f['url'])
-                if response.status_code == 200:
-                    with open(filepath, 'wb') as out:
-                        out.write(response.content)
-                    print("✓")
-                else:
-                    print("✗")
+                for future in as_completed(futures):
+                    filename = futures[future]
+                    try:
+                        etag, unchanged = future.result()
+                    except (requests.exceptions.RequestException, OSError):
+                        # Any previous copy is left intact, so keep its ETag
+                        print(f"   {filename}... ✗")
+                        continue
+                    if etag:
+                        etags[filename] = etag
+                    else:
+                        etags.pop(filename, None)
+                    reused += unchanged
+                    print(f"   {filename}... {'✓ (unchanged)' if unchanged else '✓'}")
+            
+            try:
+                etags_file.write_bytes(_dumps(etags))
+            except OSError as e:
+                logger.debug("Could not write %s: %s", etags_file, e)
+            if reused:
+                print(f"♻️  Reused {reused} unchanged file(s)")
     else:
         print("No files found.")
 
@@ -801,120 +1253,237 @@ def cmd_list(args):
     sims = client.list_simulations(sim_type=args.type, limit=args.limit)
     
     if sims:
-        print(f"\n📋 Recent Simulations")
-        print("-" * 100)
-        print(f"{'ID':<38} {'Type':<8} {'Status':<12} {'Label':<30} {'Created'}")
-        print("-" * 100)
+        rows = [
+            f"\n📋 Recent Simulations",
+            "-" * 100,
+            f"{'ID':<38} {'Type':<8} {'Status':<12} {'Label':<30} {'Created'}",
+            "-" * 100,
+        ]
         for sim in sims:
             sim_id = sim['id']
             sim_type = sim['type'].upper()
             status = sim['status']
             label = (sim.get('label', 'N/A'))[:30]
             created = format_timestamp(sim['created_at'])
-            print(f"{sim_id:<38} {sim_type:<8} {status:<12} {label:<30} {created}")
+            rows.append(f"{sim_id:<38} {sim_type:<8} {status:<12} {label:<30} {created}")
+        _write_rows(rows)
     else:
         print("No simulations found.")
 
 
+def _show_config(config: dict):
+    """Print the current configuration with the token masked."""
+    print(f"\n⚙️  Current Configuration")
+    print(f"   Config file: {CONFIG_FILE}")
+    print(f"   API URL: {config.get('url', DEFAULT_API_URL)}")
+    print(f"   Token: {f'{_TOKEN_MASK}{token[-10:]}' if (token := config.get('token')) else 'Not set'}")
+
+
 def cmd_config(args):
     """Configure API settings."""
-    config = {}
+    config = _read_config()
+    
+    # Plain --show: print and return before any of the update/write path
+    if args.show and not (args.token or args.url):
+        _show_config(config)
+        return
     
-    if os.path.exists(CONFIG_FILE):
-        with open(CONFIG_FILE, 'r') as f:
-            config = json.load(f)
+    dirty = False
     
     if args.token:
         config['token'] = args.token
+        dirty = True
         print(f"✅ API token saved to {CONFIG_FILE}")
     
     if args.url:
         config['url'] = args.url
+        dirty = True
         print(f"✅ API URL saved: {args.url}")
     
-    if args.show:
-        print(f"\n⚙️  Current Configuration")
-        print(f"   Config file: {CONFIG_FILE}")
-        print(f"   API URL: {config.get('url', DEFAULT_API_URL)}")
-        print(f"   Token: {'*' * 20 + config.get('token', '')[-10:] if config.get('token') else 'Not set'}")
-        return
+    # Only rewrite the file when something changed
+    if dirty:
+        _write_config(config)
     
-    if config:
-        with open(CONFIG_FILE, 'w') as f:
-            json.dump(config, f, indent=2)
+    # --show alongside updates shows the saved result
+    if args.show:
+        _show_config(config)
 
 
-def main():
-    parser = argparse.ArgumentParser(
-        description="WRAPI - Water Resources Modeling API CLI Tool",
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog="""
-Examples:
-  %(prog)s run model.inp --type swmm --wait
-  %(prog)s run https://example.com/model.inp --type epanet
-  %(prog)s run model.inp --type swmm --aux rainfall.dat temp.dat
-  %(prog)s status 550e8400-e29b-41d4-a716-446655440000
-  %(prog)s files 550e8400-e29b-41d4-a716-446655440000 --download ./results
-  %(prog)s list --type swmm --limit 10
-  %(prog)s config --token YOUR_API_TOKEN
-        """
-    )
-    
-    subparsers = parser.add_subparsers(dest='command', help='Commands')
-    
-    # Run command
+def _build_run_parser(subparsers):
+    """Add the `run` subcommand."""
     run_parser = subparsers.add_parser('run', help='Run a simulation')
     run_parser.add_argument('input', help='Input file path or URL')
-    run_parser.add_argument('--type', '-t', required=True, choices=['swmm', 'epanet', 'hec_ras'],
+    run_parser.add_argument('--type', '-t', required=True, choices=_SIM_TYPES,
                            help='Simulation type')
     run_parser.add_argument('--label', '-l', help='Simulation label')
     run_parser.add_argument('--aux', '-a', nargs='+', help='Auxiliary files (temperature, rainfall, etc.)')
     run_parser.add_argument('--wait', '-w', action='store_true', help='Wait for completion')
     run_parser.add_argument('--timeout', default=600, type=int, help='Wait timeout in seconds (default: 600)')
     run_parser.add_argument('--show-files', '-f', action='store_true', help='Show result files after completion')
-    
-    # Status command
+    run_parser.add_argument('--check-health', action='store_true', help='Check API health before submitting')
+    run_parser.set_defaults(func=cmd_run)
+
+
+def _build_status_parser(subparsers):
+    """Add the `status` subcommand."""
     status_parser = subparsers.add_parser('status', help='Check simulation status')
     status_parser.add_argument('id', help='Simulation ID')
-    
-    # Logs command
+    status_parser.set_defaults(func=cmd_status)
+
+
+def _build_logs_parser(subparsers):
+    """Add the `logs` subcommand."""
     logs_parser = subparsers.add_parser('logs', help='View simulation logs')
     logs_parser.add_argument('id', help='Simulation ID')
     logs_parser.add_argument('--limit', '-n', default=50, type=int, help='Number of logs to show')
-    
-    # Files command
+    logs_parser.set_defaults(func=cmd_logs)
+
+
+def _build_files_parser(subparsers):
+    """Add the `files` subcommand."""
     files_parser = subparsers.add_parser('files', help='List simulation files')
     files_parser.add_argument('id', help='Simulation ID')
     files_parser.add_argument('--download', '-d', help='Download files to directory')
-    
-    # List command
+    files_parser.set_defaults(func=cmd_files)
+
+
+def _build_list_parser(subparsers):
+    """Add the `list` subcommand."""
     list_parser = subparsers.add_parser('list', help='List simulations')
-    list_parser.add_argument('--type', '-t', choices=['swmm', 'epanet', 'hec_ras'],
+    list_parser.add_argument('--type', '-t', choices=_SIM_TYPES,
                             help='Filter by type')
     list_parser.add_argument('--limit', '-n', default=20, type=int, help='Number to show')
-    
-    # Config command
+    list_parser.set_defaults(func=cmd_list)
+
+
+def _build_config_parser(subparsers):
+    """Add the `config` subcommand."""
     config_parser = subparsers.add_parser('config', help='Configure API settings')
     config_parser.add_argument('--token', help='Set API token')
     config_parser.add_argument('--url', help='Set API URL')
     config_parser.add_argument('--show', '-s', action='store_true', help='Show current config')
+    config_parser.set_defaults(func=cmd_config)
+
+
+# Subcommand parsers are built on demand; the order here is the --help order
+SUBCMDS = {
+    'run': _build_run_parser,
+    'status': _build_status_parser,
+    'logs': _build_logs_parser,
+    'files': _build_files_parser,
+    'list': _build_list_parser,
+    'config': _build_config_parser,
+}
+_SUBCOMMANDS = frozenset(SUBCMDS)
+
+
+_HELP_EPILOG = """
+Examples:
+  %(prog)s run model.inp --type swmm --wait
+  %(prog)s run https://example.com/model.inp --type epanet
+  %(prog)s run model.inp --type swmm --aux rainfall.dat temp.dat
+  %(prog)s status 550e8400-e29b-41d4-a716-446655440000
+  %(prog)s files 550e8400-e29b-41d4-a716-446655440000 --download ./results
+  %(prog)s list --type swmm --limit 10
+  %(prog)s config --token YOUR_API_TOKEN
+        """
+
+
+def _fast_args(argv: List[str]) -> Optional[SimpleNamespace]:
+    """
+    Parse the common simple invocations without argparse:
+    `status ID`, `logs ID [-n N]`, `files ID [-d DIR]` and `config --show`.
+    
+    Returns None for anything else (run, list, help, other flags) so the full
+    parser handles it. Defaults must match the _build_*_parser functions.
+    """
+    if not argv:
+        return None
+    command, rest = argv[0], argv[1:]
+    
+    if command == 'config':
+        if rest in (['--show'], ['-s']):
+            return SimpleNamespace(command=command, func=cmd_config, verbose=False,
+                                   token=None, url=None, show=True)
+        return None
+    
+    if command not in ('status', 'logs', 'files') or not rest or rest[0].startswith('-'):
+        return None
+    args = SimpleNamespace(command=command, verbose=False, id=rest[0])
+    opts = rest[1:]
+    
+    if command == 'status':
+        args.func = cmd_status
+        return None if opts else args
+    if command == 'logs':
+        args.func, args.limit = cmd_logs, 50
+        if len(opts) == 2 and opts[0] in ('--limit', '-n') and opts[1].isdigit():
+            args.limit = int(opts[1])
+        elif opts:
+            return None
+        return args
+    
+    args.func, args.download = cmd_files, None
+    if len(opts) == 2 and opts[0] in ('--download', '-d') and not opts[1].startswith('-'):
+        args.download = opts[1]
+    elif opts:
+        return None
+    return args
+
+
+def _parse_args() -> argparse.Namespace:
+    """Parse the command line with the full argparse parser."""
+    import argparse
+    
+    # The examples epilog and its raw formatter only matter when help is shown
+    help_kwargs = {}
+    if '-h' in sys.argv or '--help' in sys.argv:
+        help_kwargs = dict(formatter_class=argparse.RawDescriptionHelpFormatter,
+                           epilog=_HELP_EPILOG)
+    
+    parser = argparse.ArgumentParser(
+        description="WRAPI - Water Resources Modeling API CLI Tool",
+        **help_kwargs
+    )
+    parser.add_argument('--verbose', '-v', action='store_true', help='Show debug output')
+    
+    subparsers = parser.add_subparsers(dest='command', help='Commands')
+    
+    # Only build the subcommand being run; help, typos and a missing command get
+    # all of them so the usage lists every command
+    command = next((arg for arg in sys.argv[1:] if not arg.startswith('-')), None)
+    if command in _SUBCOMMANDS:
+        SUBCMDS[command](subparsers)
+    else:
+        for build_parser in SUBCMDS.values():
+            build_parser(subparsers)
     
     args = parser.parse_args()
     
-    if not args.command:
+    if not hasattr(args, 'func'):
         parser.print_help()
         sys.exit(1)
     
-    commands = {
-        'run': cmd_run,
-        'status': cmd_status,
-        'logs': cmd_logs,
-        'files': cmd_files,
-        'list': cmd_list,
-        'config': cmd_config,
-    }
+    return args
+
+
+def main():
+    if len(sys.argv) == 1:
+        print("Usage: wrapi.py {run,status,logs,files,list,config} ... (try --help)")
+        sys.exit(1)
+    
+    # Simple status/logs/files/config calls skip importing and building
+    # argparse; global flags, help and unknown commands go straight to it
+    args = None
+    if sys.argv[1] in _SUBCOMMANDS:
+        args = _fast_args(sys.argv[1:])
+    if args is None:
+        args = _parse_args()
+    
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING,
+                        format='%(levelname)s: %(message)s')
     
-    commands[args.command](args)
+    args.func(args)
 
 
 if __name__ == '__main__':